@@ -8,44 +8,58 @@ match one of the supported photo naming conventions and moves them into
 
 from __future__ import annotations
 
+import errno
+import functools
 import os
-import re
 import shutil
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from pathlib import Path
 from typing import Iterator
 
 ROOT_FOLDER_NAME = "元修檔案"
 PHOTOS_FOLDER_NAME = "照片"
 LOG_FILE_NAME = "photo_sorter.log"
+# 同時掃描目錄的執行緒數
+SCAN_WORKERS = 8
+# 同時搬移文件的執行緒數（以日期資料夾為單位分配）
+MOVE_WORKERS = 8
 
 # Pattern a: 20241019_111535，可接受額外尾碼
-PATTERN_DATE_TIME = re.compile(r"^(?P<date>\d{8})_\d{4,6}.*$")
-
-# Pattern b: Screenshot_20250831_203240_LINE (case insensitive suffix)
-PATTERN_SCREENSHOT = re.compile(
-    r"^screenshot_(?P<date>\d{8})_\d{4,6}_(?P<tail>.+)$",
-    flags=re.IGNORECASE,
-)
-
+# Pattern b: Screenshot_20250831_203240_LINE (case insensitive prefix)
 # Pattern c: VideoCapture_20251028，可接受尾碼
-PATTERN_VIDEO_CAPTURE = re.compile(
-    r"^videocapture_(?P<date>\d{8}).*$",
-    flags=re.IGNORECASE,
-)
+# 三種規則皆以字串切片與 isdecimal() 判斷，不使用正規表達式
+SCREENSHOT_PREFIX = "screenshot_"
+VIDEO_CAPTURE_PREFIX = "videocapture_"
 
 class Logger:
     """同時輸出到終端和日誌文件的記錄器"""
 
+    # 每寫入這麼多行才 flush 一次日誌文件
+    FLUSH_INTERVAL = 1000
+
     def __init__(self, log_file_path: Path):
         self.log_file_path = log_file_path
         self.log_file = None
+        self.pending_lines = 0
+        # 同一秒內重複使用已格式化的時間戳
+        self.last_ts_second = -1
+        self.last_ts_str = ""
+
+    def _timestamp(self) -> str:
+        """Return the current local time formatted to the second, cached per second."""
+        now = time.time()
+        second = int(now)
+        if second != self.last_ts_second:
+            self.last_ts_second = second
+            self.last_ts_str = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now))
+        return self.last_ts_str
 
     def __enter__(self):
         """開啟日誌文件（追加模式）"""
-        self.log_file = open(self.log_file_path, "a", encoding="utf-8")
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.log_file = open(self.log_file_path, "a", encoding="utf-8", buffering=8192)
+        timestamp = self._timestamp()
         self.log_file.write(f"\n{'='*60}\n")
         self.log_file.write(f"執行時間：{timestamp}\n")
         self.log_file.write(f"{'='*60}\n")
@@ -55,88 +69,189 @@ class Logger:
     def __exit__(self, exc_type, exc_val, exc_tb):
         """關閉日誌文件"""
         if self.log_file:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            timestamp = self._timestamp()
             self.log_file.write(f"結束時間：{timestamp}\n")
             self.log_file.write(f"{'='*60}\n\n")
+            # close() 會將緩衝區剩餘內容寫入
             self.log_file.close()
 
     def log(self, message: str) -> None:
         """同時輸出到終端和日誌文件"""
         # 輸出到終端
         print(message)
-        # 輸出到日誌文件（帶時間戳）
+        # 輸出到日誌文件（帶時間戳），累積一定行數才 flush
         if self.log_file:
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.log_file.write(f"[{timestamp}] {message}\n")
-            self.log_file.flush()
-
-
-def iter_candidate_files(root: Path, exclude_path: Path | None = None) -> Iterator[Path]:
-    """Yield files (not directories) under ``root`` recursively, excluding subdirectories of exclude_path."""
-    for path in root.rglob("*"):
-        if path.is_file():
-            # 如果指定了排除路徑，且文件在排除路徑的子目錄中（不包括排除路徑本身），則跳過
-            if exclude_path:
-                try:
-                    path_resolved = path.resolve()
-                    exclude_resolved = exclude_path.resolve()
-                    # 如果文件的父目錄是排除路徑的子目錄（不包括排除路徑本身），則跳過
-                    # 這樣可以掃描排除路徑本身，但不掃描其子目錄
-                    if path_resolved.parent != exclude_resolved and exclude_resolved in path_resolved.parents:
-                        continue
-                except (FileNotFoundError, ValueError):
-                    pass
-            yield path
-
-
+            self.log_file.write(f"[{self._timestamp()}] {message}\n")
+            self.pending_lines += 1
+            if self.pending_lines >= self.FLUSH_INTERVAL:
+                self.log_file.flush()
+                self.pending_lines = 0
+
+
+def scan_directory(path: str, descend: bool = True) -> tuple[list[str], list[str]]:
+    """Return ``(files, subdirectories)`` directly inside ``path``; subdirectories are omitted unless ``descend``.
+
+    Symbolic links are skipped. Classification only needs the name, so no
+    ``stat`` call is made unless the filesystem does not report the entry type.
+    """
+    files: list[str] = []
+    subdirs: list[str] = []
+    # 一次讀完整個目錄的項目，再分成子目錄與文件處理
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return files, subdirs
+    # is_file/is_dir(follow_symlinks=False) 直接使用目錄項目的 d_type，符號連結兩者皆為 False；
+    # 大部分項目是文件，先判斷 is_file 可省下一次判斷
+    for entry in entries:
+        if entry.is_file(follow_symlinks=False):
+            files.append(entry.path)
+        elif descend and entry.is_dir(follow_symlinks=False):
+            subdirs.append(entry.path)
+    return files, subdirs
+
+
+def iter_candidate_files(root: Path, exclude_path: Path | None = None) -> Iterator[str]:
+    """Yield file paths (as ``str``) under ``root`` recursively, excluding subdirectories of exclude_path."""
+    # 排除路徑只在走訪前解析一次，於目錄層級剪枝，不再對每個文件呼叫 resolve()
+    exclude_resolved = os.fspath(exclude_path.resolve()) if exclude_path else None
+    # 起點同樣只解析一次，其下的 entry.path 便與排除路徑同一形式，可直接以字串比對
+    root_resolved = os.fspath(Path(root).resolve())
+
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as executor:
+
+        def submit(path: str) -> Future:
+            # 掃描排除路徑本身的文件，但不進入其子目錄（已分類的日期資料夾）
+            return executor.submit(scan_directory, path, path != exclude_resolved)
+
+        # 多個執行緒同時掃描目錄，主執行緒依完成順序產出文件並排入子目錄
+        pending = {submit(root_resolved)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirs = future.result()
+                pending.update(submit(subdir) for subdir in subdirs)
+                yield from files
+
+
+@functools.lru_cache(maxsize=8192)
 def extract_date_from_name(filename: str) -> str | None:
     """Return YYYYMMDD date string if filename matches supported patterns."""
-    stem = Path(filename).stem
-    for pattern in (PATTERN_DATE_TIME, PATTERN_SCREENSHOT, PATTERN_VIDEO_CAPTURE):
-        match = pattern.match(stem)
-        if match:
-            return match.group("date")
+    stem = os.path.splitext(filename)[0]
+    head = stem[:13].lower()
+    if head.startswith(SCREENSHOT_PREFIX):
+        date = stem[11:19]
+        time_digits, _, tail = stem[20:].partition("_")
+        if (
+            len(date) == 8
+            and date.isdecimal()
+            and stem[19:20] == "_"
+            and 4 <= len(time_digits) <= 6
+            and time_digits.isdecimal()
+            and tail
+        ):
+            return date
+        return None
+    if head.startswith(VIDEO_CAPTURE_PREFIX):
+        date = stem[13:21]
+        return date if len(date) == 8 and date.isdecimal() else None
+    date, time_digits = stem[:8], stem[9:13]
+    if (
+        len(date) == 8
+        and date.isdecimal()
+        and stem[8:9] == "_"
+        and len(time_digits) == 4
+        and time_digits.isdecimal()
+    ):
+        return date
     return None
 
 
-def move_file(src: Path, dest_dir: Path) -> None:
-    dest_dir.mkdir(parents=True, exist_ok=True)
-    destination = dest_dir / src.name
+def move_file(src: str, dest_dir: str, name: str | None = None) -> None:
+    """Move ``src`` into ``dest_dir`` (which must already exist) as ``name``, renaming on name clashes."""
+    if name is None:
+        name = os.path.basename(src)
+    destination = os.path.join(dest_dir, name)
 
-    if destination.exists():
+    # 使用 lexists 檢查是否重名，不追蹤符號連結；重名時只做字串拼接，不建立路徑物件
+    if os.path.lexists(destination):
+        stem, ext = os.path.splitext(name)
+        prefix = os.path.join(dest_dir, stem)
         duplicate = 1
         while True:
-            candidate = destination.with_stem(f"{destination.stem}_{duplicate}")
-            if not candidate.exists():
+            candidate = f"{prefix}_{duplicate}{ext}"
+            if not os.path.lexists(candidate):
                 destination = candidate
                 break
             duplicate += 1
 
-    shutil.move(str(src), destination)
+    # 同一檔案系統時直接 rename（單一系統呼叫），跨檔案系統才退回 shutil.move
+    try:
+        os.rename(src, destination)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        shutil.move(src, destination)
 
 
-def classify_photos(search_root: Path, destination_root: Path) -> tuple[int, int]:
-    moved = skipped = 0
-    
+def move_files(moves: list[tuple[str, str]], dest_dir: str) -> int:
+    """Move each ``(src, name)`` in ``moves`` into ``dest_dir`` in order and return how many were moved."""
+    for src, name in moves:
+        move_file(src, dest_dir, name)
+    return len(moves)
+
+
+def plan_moves(search_root: Path, destination_root: Path) -> tuple[list[tuple[str, str, str]], int]:
+    """Scan ``search_root`` without touching any file.
+
+    Return ``(plan, skipped)`` where each plan entry is ``(src, dest_dir, dest_name)``.
+    """
+    plan: list[tuple[str, str, str]] = []
+    skipped = 0
+    # 目的地路徑只解析一次，迴圈內以字串比對，不再對每個文件呼叫 resolve()
+    dest_root_resolved = os.fspath(destination_root.resolve())
+
     for file_path in iter_candidate_files(search_root, exclude_path=destination_root):
-        date_str = extract_date_from_name(file_path.name)
+        name = os.path.basename(file_path)
+        date_str = extract_date_from_name(name)
         if not date_str:
             skipped += 1
             continue
 
-        dest_dir = destination_root / date_str
-
-        try:
-            if file_path.resolve().parent == dest_dir.resolve():
-                skipped += 1
-                continue
-        except FileNotFoundError:
+        dest_dir = os.path.join(dest_root_resolved, date_str)
+        if os.path.dirname(os.path.abspath(file_path)) == dest_dir:
             skipped += 1
             continue
 
-        move_file(file_path, dest_dir)
-        moved += 1
+        plan.append((file_path, dest_dir, name))
+
+    return plan, skipped
+
+
+def apply_moves(plan: list[tuple[str, str, str]]) -> int:
+    """Carry out a plan from :func:`plan_moves` and return the number of files moved."""
+    # 排序後依目的資料夾分組，讓重名時的編號順序固定
+    moves_by_dir: dict[str, list[tuple[str, str]]] = {}
+    for src, dest_dir, name in sorted(plan):
+        moves_by_dir.setdefault(dest_dir, []).append((src, name))
 
+    # 每個目的資料夾只建立一次（依序建立），再搬移其中所有文件
+    for dest_dir in moves_by_dir:
+        os.makedirs(dest_dir, exist_ok=True)
+
+    # 不同資料夾之間平行搬移；同一資料夾由單一執行緒處理，避免重名檢查互相競爭
+    moved = 0
+    with ThreadPoolExecutor(max_workers=MOVE_WORKERS) as executor:
+        futures = [executor.submit(move_files, moves, dest_dir) for dest_dir, moves in moves_by_dir.items()]
+        for future in futures:
+            moved += future.result()
+    return moved
+
+
+def classify_photos(search_root: Path, destination_root: Path) -> tuple[int, int]:
+    plan, skipped = plan_moves(search_root, destination_root)
+    moved = apply_moves(plan)
     return moved, skipped
 
 